@@ -2,7 +2,8 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy.signal import find_peaks
+from regimes import detect_regimes, turning_points
+from portfolio import shrunk_moments, min_variance_weights, max_sharpe_weights, risk_parity_weights, efficient_frontier, backtest
 
 #Load CSV files
 btc = pd.read_csv("bitcoin_dataset.csv", skiprows=3)
@@ -27,9 +28,9 @@ gold = gold.loc["2018":"2025"].copy()
 btc_start, btc_max, btc_end = btc['Close'].iloc[0], btc['Close'].max(), btc['Close'].iloc[-1]
 eth_start, eth_max, eth_end = eth['Close'].iloc[0], eth['Close'].max(), eth['Close'].iloc[-1]
 
-# 4. Detect peaks
-btc_peaks, _ = find_peaks(btc['Close'], distance=90, prominence=3000)
-eth_peaks, _ = find_peaks(eth['Close'], distance=120, prominence=400)
+# 4. Detect peaks (turning_points defaults: 30% rise or ~23% fall, >= 90 days apart, same for every asset)
+btc_peaks, _ = turning_points(btc['Close'])
+eth_peaks, _ = turning_points(eth['Close'])
 eth_top_peaks = eth_peaks[np.argsort(eth['Close'].iloc[eth_peaks])[-3:]]
 
 # 5. Plot Price Evolution
@@ -74,15 +75,15 @@ plt.figure(figsize=(13,6))
 plt.plot(btc.index, btc['Volatility'], label='BTC Volatility', color='#F7931A', linewidth=2)
 plt.plot(eth.index, eth['Volatility'], label='ETH Volatility', color='#3C6EFA', linewidth=2)
 
-#Shaded regions for major events with labels for legend
-plt.axvspan(pd.to_datetime('2020-02-01'), pd.to_datetime('2021-06-30'), color='red', alpha=0.2, label='COVID Crash')
-plt.axvspan(pd.to_datetime('2021-05-01'), pd.to_datetime('2022-06-30'), color='orange', alpha=0.15, label='Bear Market')
-plt.axvspan(pd.to_datetime('2022-11-01'), pd.to_datetime('2022-11-30'), color='purple', alpha=0.2, label='FTX Collapse')
+# Shaded high-volatility regimes detected from BTC returns
+btc_regimes = detect_regimes(btc['Return'])
+btc_avg_vol = btc['Return'].std() * np.sqrt(365)
+high_vol = btc_regimes[btc_regimes['volatility'] > btc_avg_vol]
 
-# Add text annotations
-plt.text(pd.to_datetime('2020-07-01'), max(btc['Volatility'])*0.9, 'COVID Crash', color='red', fontsize=10)
-plt.text(pd.to_datetime('2021-06-01'), max(btc['Volatility'])*0.8, 'Bear Market', color='orange', fontsize=10)
-plt.text(pd.to_datetime('2022-11-05'), max(btc['Volatility'])*0.85, 'FTX Collapse', color='purple', fontsize=10)
+for i, (_, r) in enumerate(high_vol.iterrows()):
+    plt.axvspan(r['start'], r['end'], color='red', alpha=0.15,
+                label='High-Volatility Regime (BTC)' if i == 0 else None)
+    plt.text(r['start'], max(btc['Volatility'])*0.9, f"{r['volatility']:.0%}", color='red', fontsize=9)
 
 plt.title('Bitcoin vs Ethereum Volatility (30-Day Rolling, 2018–2025)', fontsize=14, weight='bold')
 plt.xlabel('Date')
@@ -106,3 +107,37 @@ plt.title('Correlation Between Daily Returns (BTC, ETH, Gold)', fontsize=13)
 plt.show()
 
 print("\n📊 Correlation matrix:\n", corr.round(2))
+
+# 8. Portfolio Weights, Efficient Frontier & Weekly Rebalanced Backtest
+mu, cov, shrinkage = shrunk_moments(combined.to_numpy()[None])
+weights = pd.DataFrame({
+    'Min Variance': min_variance_weights(cov, long_only=True)[0],
+    'Max Sharpe': max_sharpe_weights(mu, cov, long_only=True)[0],
+    'Risk Parity': risk_parity_weights(cov)[0],
+}, index=combined.columns)
+print(f"\n📊 Portfolio weights (Ledoit-Wolf shrinkage {shrinkage[0]:.2f}):\n", weights.round(3))
+
+frontier = efficient_frontier(combined.mean(), pd.DataFrame(cov[0], index=combined.columns, columns=combined.columns),
+                              periods=252)
+
+plt.figure(figsize=(8,6))
+plt.plot(frontier['Volatility'], frontier['Return'], color='#3C6EFA', linewidth=2, label='Efficient Frontier')
+for name, color in [('Bitcoin_Return', '#F7931A'), ('Ethereum_Return', '#3C3C3D'), ('Gold_Return', 'goldenrod')]:
+    plt.scatter(combined[name].std() * np.sqrt(252), combined[name].mean() * 252, color=color, s=60, label=name.split('_')[0])
+plt.title('Efficient Frontier (BTC, ETH, Gold)', fontsize=13)
+plt.xlabel('Volatility (Annualized)')
+plt.ylabel('Return (Annualized)')
+plt.legend()
+plt.tight_layout()
+plt.show()
+
+plt.figure(figsize=(13,6))
+for method in ['min_variance', 'max_sharpe', 'risk_parity', 'equal_weight']:
+    port, _, summary = backtest(combined, method=method, lookback=252, rebalance='W', cost_bps=10, periods=252)
+    plt.plot(port.index, (1 + port).cumprod(), linewidth=2, label=f"{method} (Sharpe {summary['Sharpe']:.2f})")
+plt.title('Weekly Rebalanced Portfolios (1-Year Lookback)', fontsize=14, weight='bold')
+plt.xlabel('Date')
+plt.ylabel('Growth of $1')
+plt.legend()
+plt.tight_layout()
+plt.show()
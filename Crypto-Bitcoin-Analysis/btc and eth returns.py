@@ -1,4 +1,5 @@
 import pandas as pd
+from derived import DerivedColumns
 
 # 1. Load the original CSV files
 btc = pd.read_csv("bitcoin_dataset.csv", skiprows=3)
@@ -8,13 +9,17 @@ eth = pd.read_csv("ethereum_dataset.csv", skiprows=3)
 for df in [btc, eth]:
     df.columns = ['Date', 'Close', 'High', 'Low', 'Open', 'Volume']
     df['Date'] = pd.to_datetime(df['Date'])
+    df.set_index('Date', inplace=True)
 
-#  3. Calculate Daily Returns
-btc['Returns'] = btc['Close'].pct_change()
-eth['Returns'] = eth['Close'].pct_change()
+#  3. Declare Daily Returns as a derived column (computed on first access)
+btc = DerivedColumns(btc, store_dir="bitcoin_columns")
+eth = DerivedColumns(eth, store_dir="ethereum_columns")
 
-#4. Save to new CSV files
-btc.to_csv("bitcoin_dataset_with_returns.csv", index=False)
-eth.to_csv("ethereum_dataset_with_returns.csv", index=False)
+btc.define('Returns', lambda d: d['Close'].pct_change(), deps=['Close'])
+eth.define('Returns', lambda d: d['Close'].pct_change(), deps=['Close'])
 
-print("✅ Returns column added and new CSV files saved successfully!")
+#4. Save only the new column (skipped if already up to date)
+btc.persist('Returns')
+eth.persist('Returns')
+
+print("✅ Returns column saved to bitcoin_columns/ and ethereum_columns/ successfully!")
@@ -0,0 +1,305 @@
+import hashlib
+import json
+import os
+import re
+import types
+
+import numpy as np
+import pandas as pd
+
+
+# 1️ Derived-column layer
+#
+# Base columns (prices, supply, activity) live in one frame. Derived columns
+# (returns, market cap, indicators, macro joins) are declared once as
+# expressions over other columns, computed on first access, memoised until
+# one of their inputs changes, and persisted as one small file per column.
+
+class DerivedColumns:
+    """Lazy, memoised derived columns on top of a base DataFrame.
+
+    expr is either a pandas eval string ("Close * SplyCur") or a function
+    taking this object and returning a Series, e.g.
+    lambda d: d["Close"].pct_change(). Derived columns may use other derived
+    columns. If store_dir is given, persist() writes each derived column to
+    store_dir/<name>.csv and later runs reload it instead of recomputing, as
+    long as its inputs are unchanged.
+    """
+
+    def __init__(self, base, store_dir=None):
+        self._base = base.copy()
+        self._versions = {col: 0 for col in self._base.columns}
+        self._defs = {}
+        self._cache = {}
+        self._fingerprints = {}
+        self._index_fingerprint = None
+        self.store_dir = store_dir
+        self._manifest = {}
+        if store_dir and os.path.exists(self._manifest_path()):
+            with open(self._manifest_path()) as f:
+                self._manifest = json.load(f)
+
+    @property
+    def index(self):
+        return self._base.index
+
+    @property
+    def columns(self):
+        return list(self._base.columns) + list(self._defs)
+
+    # 2️ Declaring columns
+
+    def define(self, name, expr, deps=None, key=None):
+        """Declare a derived column. deps is inferred for eval strings.
+
+        Callables are fingerprinted from their code, default arguments, closure
+        values and the module globals they read (recursing into helper
+        functions); pass key (any string that changes with the definition)
+        when those can't be hashed stably.
+        """
+        if name in self._base.columns:
+            raise ValueError(f"{name} is already a base column")
+        if deps is None:
+            if not isinstance(expr, str):
+                raise ValueError(f"deps must be given for callable column {name}")
+            # Identifiers, skipping attributes (.abs) and exponents (1e5)
+            names = set(re.findall(r"(?<![\w.])[A-Za-z_]\w*", expr))
+            deps = [c for c in self.columns if c in names]
+            missing = sorted(names - set(self.columns) - _EVAL_NAMES)
+            if missing:
+                raise KeyError(f"{name} depends on unknown columns: {missing}")
+        missing = [d for d in deps if d not in self.columns]
+        if missing:
+            raise KeyError(f"{name} depends on unknown columns: {missing}")
+        if key is not None:
+            expr_key = key
+        else:
+            expr_key = _expr_key(expr)  # fails early for unhashable callables
+        self._defs[name] = (expr, list(deps), expr_key)
+        self._cache.clear()  # a redefinition also changes anything built on it
+        return self
+
+    def join(self, name, series, how="ffill"):
+        """Declare a column joined from another series (e.g. a macro indicator).
+
+        The series is aligned on this frame's index; how="ffill" carries lower
+        frequency values (monthly inflation, FX fixings) forward to daily bars.
+        """
+        series = series.sort_index()
+
+        def _join(d):
+            aligned = series.reindex(series.index.union(d.index))
+            if how == "ffill":
+                aligned = aligned.ffill()
+            return aligned.reindex(d.index)
+
+        key = f"join:{how}:{_value_key(series)}"
+        return self.define(name, _join, deps=[], key=key)
+
+    # 3️ Access, memoisation and invalidation
+
+    def __getitem__(self, name):
+        if name in self._base.columns:
+            return self._base[name]
+        if name not in self._defs:
+            raise KeyError(name)
+
+        key = self._version_key(name)
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        values = self._load(name)
+        if values is None:
+            expr, deps, _ = self._defs[name]
+            if isinstance(expr, str):
+                frame = pd.DataFrame({d: self[d] for d in deps}, index=self.index)
+                values = frame.eval(expr)
+            else:
+                values = expr(self)
+            values = pd.Series(values, index=self.index, name=name)
+        self._cache[name] = (key, values)
+        return values
+
+    def __setitem__(self, name, values):
+        """Replace (or add) a base column; dependent columns are recomputed on next access."""
+        if name in self._defs:
+            raise ValueError(f"{name} is a derived column")
+        self._base[name] = values
+        self._versions[name] = self._versions.get(name, 0) + 1
+        self._fingerprints.pop(name, None)
+
+    def _version_key(self, name):
+        if name in self._base.columns:
+            return (name, self._versions[name])
+        return (name, tuple(self._version_key(d) for d in self._defs[name][1]))
+
+    def frame(self, *names):
+        """Materialise base columns plus the requested derived columns as one DataFrame."""
+        out = self._base.copy()
+        for name in names or self._defs:
+            out[name] = self[name]
+        return out
+
+    # 4️ Persistence, one file per derived column
+
+    def fingerprint(self, name):
+        """Content hash of a column's definition and all of its inputs."""
+        if name in self._base.columns:
+            cached = self._fingerprints.get(name)
+            if cached is None or cached[0] != self._versions[name]:
+                digest = pd.util.hash_pandas_object(self._base[name]).to_numpy().tobytes()
+                cached = (self._versions[name], hashlib.sha1(digest).hexdigest())
+                self._fingerprints[name] = cached
+            return cached[1]
+
+        _, deps, expr_key = self._defs[name]
+        h = hashlib.sha1(expr_key.encode())
+        # The index is an input of every derived column (joins have no column deps)
+        if self._index_fingerprint is None:
+            digest = pd.util.hash_pandas_object(self.index).to_numpy().tobytes()
+            self._index_fingerprint = hashlib.sha1(digest).hexdigest()
+        h.update(self._index_fingerprint.encode())
+        for d in deps:
+            h.update(self.fingerprint(d).encode())
+        return h.hexdigest()
+
+    def persist(self, *names, float_format=None):
+        """Write derived columns to store_dir; unchanged columns are not rewritten.
+
+        The default writes full precision, so a reloaded column equals a freshly
+        computed one. A rounded float_format gives smaller files, but those
+        copies are never reloaded in place of computing the column.
+        """
+        if not self.store_dir:
+            raise ValueError("store_dir is not set")
+        os.makedirs(self.store_dir, exist_ok=True)
+        written = []
+        for name in names or self._defs:
+            entry = {"fingerprint": self.fingerprint(name), "exact": float_format is None}
+            path = self._column_path(name)
+            if self._manifest.get(name) == entry and os.path.exists(path):
+                continue
+            self[name].to_frame().to_csv(path, float_format=float_format)
+            self._manifest[name] = entry
+            written.append(path)
+        with open(self._manifest_path(), "w") as f:
+            json.dump(self._manifest, f, indent=2)
+        return written
+
+    def _load(self, name):
+        entry = self._manifest.get(name) if self.store_dir else None
+        if not isinstance(entry, dict) or not entry.get("exact") or entry.get("fingerprint") != self.fingerprint(name):
+            return None
+        path = self._column_path(name)
+        if not os.path.exists(path):
+            return None
+        col = pd.read_csv(path, index_col=0, float_precision="round_trip")[name]
+        stored = pd.to_datetime(col.index) if isinstance(self.index, pd.DatetimeIndex) else col.index
+        # Backstop: never realign a file written for different dates
+        if len(stored) != len(self.index) or not (stored == self.index).all():
+            return None
+        col.index = self.index
+        return col
+
+    def _column_path(self, name):
+        return os.path.join(self.store_dir, f"{name}.csv")
+
+    def _manifest_path(self):
+        return os.path.join(self.store_dir, "manifest.json")
+
+
+# Names pandas eval understands without them being columns
+_EVAL_NAMES = {
+    "and", "or", "not", "in", "True", "False",
+    "sin", "cos", "tan", "arcsin", "arccos", "arctan", "arctan2", "sinh", "cosh", "tanh",
+    "arcsinh", "arccosh", "arctanh", "exp", "expm1", "log", "log1p", "log10", "sqrt", "abs",
+}
+
+
+def _expr_key(expr, _seen=None):
+    if isinstance(expr, str):
+        return expr
+    _seen = set() if _seen is None else _seen
+    if id(expr) in _seen:
+        return f"<recursive {expr.__qualname__}>"
+    _seen.add(id(expr))
+
+    closure = tuple(_value_key(c.cell_contents, _seen) for c in expr.__closure__ or ())
+    kwdefaults = sorted((expr.__kwdefaults__ or {}).items())
+    # co_names also holds attribute names; only those bound in the module count
+    module_globals = getattr(expr, "__globals__", {})
+    used_globals = tuple((n, _value_key(module_globals[n], _seen))
+                         for n in sorted(_global_names(expr.__code__)) if n in module_globals)
+    return repr((_code_key(expr.__code__),
+                 tuple(_value_key(v, _seen) for v in expr.__defaults__ or ()),
+                 tuple((k, _value_key(v, _seen)) for k, v in kwdefaults),
+                 closure,
+                 used_globals))
+
+
+def _code_key(code):
+    # Stable across runs (nested code objects would otherwise repr with their address)
+    consts = tuple(_code_key(c) if hasattr(c, "co_code") else c for c in code.co_consts)
+    return repr((code.co_code, consts, code.co_names))
+
+
+def _global_names(code):
+    names = set(code.co_names)
+    for c in code.co_consts:
+        if hasattr(c, "co_code"):
+            names |= _global_names(c)
+    return names
+
+
+def _value_key(value, _seen=None):
+    # Stable text for a default argument, closure value or global
+    if isinstance(value, (pd.Series, pd.DataFrame, pd.Index)):
+        return hashlib.sha1(pd.util.hash_pandas_object(value).to_numpy().tobytes()).hexdigest()
+    if isinstance(value, np.ndarray):
+        return hashlib.sha1(repr((value.dtype.str, value.shape)).encode() + value.tobytes()).hexdigest()
+    if isinstance(value, types.ModuleType):
+        return f"module:{value.__name__}"
+    if hasattr(value, "__code__"):
+        return _expr_key(value, _seen)
+    text = repr(value)
+    if " at 0x" in text:
+        raise ValueError(f"Can't fingerprint {text}; pass key= to define()")
+    return text
+
+
+if __name__ == "__main__":
+    # Regression check: persisted columns are recomputed when a global or a
+    # helper function they use changes (python derived.py)
+    import tempfile
+
+    base = pd.DataFrame({"Close": np.arange(1.0, 11.0)}, index=pd.date_range("2020-01-01", periods=10))
+
+    def helper(close):
+        return close * 2
+
+    with tempfile.TemporaryDirectory() as store:
+        WINDOW = 2
+        d = DerivedColumns(base, store_dir=store)
+        d.define("MA", lambda d: d["Close"].rolling(WINDOW).mean(), deps=["Close"])
+        d.define("Double", lambda d: helper(d["Close"]), deps=["Close"])
+        d.persist()
+
+        WINDOW = 5
+
+        def helper(close):
+            return close * 3
+
+        d = DerivedColumns(base, store_dir=store)
+        d.define("MA", lambda d: d["Close"].rolling(WINDOW).mean(), deps=["Close"])
+        d.define("Double", lambda d: helper(d["Close"]), deps=["Close"])
+        assert d["MA"].equals(base["Close"].rolling(5).mean()), "stale MA reloaded"
+        assert d["Double"].equals(base["Close"] * 3), "stale helper result reloaded"
+
+        try:
+            d.define("X", "Close * Missing")
+        except KeyError:
+            pass
+        else:
+            raise AssertionError("unknown eval name accepted")
+    print("derived.py regression checks passed")
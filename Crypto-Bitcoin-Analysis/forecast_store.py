@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+# 1️ Persistent forecast store
+#
+# Each forecast run is stored once, column by column, in its own folder:
+#   <root>/<run_id>/ds.npy       forecast dates (int64 ns, sorted)
+#   <root>/<run_id>/values.npy   yhat, yhat_lower, yhat_upper (3 x n float64)
+# and catalog.json lists every run with its key
+# (asset, model name, model config, data version, run time).
+# Queries memory-map the columns once and binary-search the date column,
+# so a point or range lookup is O(log n) and doesn't refit anything.
+
+VALUE_COLUMNS = ["yhat", "yhat_lower", "yhat_upper"]
+
+
+def config_id(config):
+    """Short stable id of a model configuration dict."""
+    return hashlib.sha1(json.dumps(config or {}, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def data_version(df):
+    """Content hash of the training data, e.g. the Prophet ds/y frame."""
+    return hashlib.sha1(pd.util.hash_pandas_object(df).to_numpy().tobytes()).hexdigest()[:12]
+
+
+def _utc(ts):
+    # Run times are stored as naive UTC; naive inputs are taken to be UTC already
+    ts = pd.Timestamp(ts)
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tz is not None else ts
+
+
+class ForecastStore:
+    """Save Prophet forecast frames and query yhat / yhat_lower / yhat_upper by date.
+
+    store = ForecastStore("forecast_store")
+    store.save("BTC", btc_forecast, model="prophet_seasonal", config={"periods": 30},
+               data_version=data_version(btc_df))
+    store.point("BTC", "2026-06-01", model="prophet_seasonal")   # latest run of that model
+    store.range("BTC", "2026-01-01", "2026-03-31", model="prophet_seasonal")
+
+    Queries without model= or config= only work while an asset has runs of a
+    single model and config; otherwise they raise rather than mix models.
+    """
+
+    def __init__(self, root="forecast_store"):
+        self.root = root
+        self._columns = {}  # run_id -> (ds, values), memory-mapped
+        self._latest = {}   # (asset, model, config, data_version) filter -> run_id
+        os.makedirs(root, exist_ok=True)
+        self._catalog = self._read_catalog()
+
+    # 2️ Writing runs
+
+    def save(self, asset, forecast, model=None, config=None, data_version=None, run_time=None):
+        """Store one forecast run and return its run_id (run_time defaults to now, in UTC).
+
+        The columns are written to a scratch folder, then the catalog, then the
+        folder is renamed into place; on any failure both are rolled back.
+        """
+        # Validated (and numpy scalars etc. turned into text) before anything is written
+        config = json.loads(json.dumps(config or {}, sort_keys=True, default=str))
+        run_time = _utc(run_time if run_time is not None else pd.Timestamp.now(tz="UTC"))
+        cid = config_id(config)
+        run_id = f"{asset}-{cid[:8]}-{(data_version or 'na')[:8]}-{run_time:%Y%m%dT%H%M%S%f}"
+
+        df = forecast[["ds"] + VALUE_COLUMNS].sort_values("ds").drop_duplicates("ds", keep="last")
+        ds = pd.DatetimeIndex(df["ds"]).as_unit("ns").asi8
+        values = np.ascontiguousarray(df[VALUE_COLUMNS].to_numpy(dtype=np.float64).T)
+
+        catalog = [r for r in self._catalog if r["run_id"] != run_id]
+        catalog.append({
+            "run_id": run_id,
+            "asset": asset,
+            "model": model,
+            "config_id": cid,
+            "config": config,
+            "data_version": data_version,
+            "run_time": f"{run_time:%Y-%m-%dT%H:%M:%S.%f}",  # sorts chronologically as text
+            "n": len(ds),
+            "start": str(pd.Timestamp(ds[0])) if len(ds) else None,
+            "end": str(pd.Timestamp(ds[-1])) if len(ds) else None,
+        })
+
+        path = os.path.join(self.root, run_id)
+        partial = path + ".partial"
+        previous = self._catalog
+        try:
+            os.makedirs(partial, exist_ok=True)
+            np.save(os.path.join(partial, "ds.npy"), ds)
+            np.save(os.path.join(partial, "values.npy"), values)
+            self._write_catalog(catalog)
+            self._columns.pop(run_id, None)
+            if os.path.isdir(path):
+                shutil.rmtree(path)  # same asset, key and run time saved again
+            os.replace(partial, path)
+        except BaseException:
+            shutil.rmtree(partial, ignore_errors=True)
+            if self._catalog is not previous:
+                self._write_catalog(previous)
+            raise
+        return run_id
+
+    # 3️ Finding runs
+
+    def runs(self, asset=None, model=None, config=None, data_version=None):
+        """Catalog of stored runs matching the filters, oldest first (run_time in UTC)."""
+        rows = self._match(asset, model, config, data_version)
+        out = pd.DataFrame(rows, columns=["run_id", "asset", "model", "config_id", "data_version", "run_time",
+                                          "n", "start", "end"])
+        out = out.sort_values("run_time").reset_index(drop=True)
+        out["run_time"] = pd.to_datetime(out["run_time"], format="%Y-%m-%dT%H:%M:%S.%f")
+        return out
+
+    def latest(self, asset, model=None, config=None, data_version=None):
+        """run_id of the most recent run for an asset and model (optionally one config / data version).
+
+        model (or config) may only be left out while the asset's matching runs
+        all come from one model and config.
+        """
+        key = (asset, model, config_id(config) if config is not None else None, data_version)
+        run_id = self._latest.get(key)
+        if run_id is None:
+            rows = self._match(asset, model, config, data_version)
+            if not rows:
+                raise KeyError(f"No forecast runs for {asset}")
+            if model is None and config is None:
+                kinds = {(r.get("model"), r["config_id"]) for r in rows}
+                if len(kinds) > 1:
+                    models = sorted({str(m) for m, _ in kinds})
+                    raise ValueError(f"{asset} has runs of several models/configs ({', '.join(models)}); "
+                                     "pass model= or config=")
+            run_id = self._latest[key] = max(rows, key=lambda r: r["run_time"])["run_id"]
+        return run_id
+
+    def _match(self, asset, model, config, data_version):
+        cid = config_id(config) if config is not None else None
+        return [r for r in self._catalog
+                if (asset is None or r["asset"] == asset)
+                and (model is None or r.get("model") == model)
+                and (cid is None or r["config_id"] == cid)
+                and (data_version is None or r["data_version"] == data_version)]
+
+    # 4️ Point and range queries
+
+    def point(self, asset, date, run_id=None, model=None, config=None, data_version=None):
+        """{'yhat', 'yhat_lower', 'yhat_upper'} for one forecast date."""
+        ds, values = self._open(run_id or self.latest(asset, model, config, data_version))
+        t = pd.Timestamp(date).as_unit("ns").value
+        i = np.searchsorted(ds, t)
+        if i == len(ds) or ds[i] != t:
+            raise KeyError(f"{pd.Timestamp(date)} is not in the {asset} forecast")
+        return dict(zip(VALUE_COLUMNS, values[:, i].tolist()))
+
+    def range(self, asset, start=None, end=None, run_id=None, model=None, config=None, data_version=None):
+        """Forecast rows with start <= ds <= end as a DataFrame (ds, yhat, yhat_lower, yhat_upper)."""
+        ds, values = self._open(run_id or self.latest(asset, model, config, data_version))
+        lo = 0 if start is None else np.searchsorted(ds, pd.Timestamp(start).as_unit("ns").value, side="left")
+        hi = len(ds) if end is None else np.searchsorted(ds, pd.Timestamp(end).as_unit("ns").value, side="right")
+        out = pd.DataFrame(np.asarray(values[:, lo:hi]).T, columns=VALUE_COLUMNS)
+        out.insert(0, "ds", pd.to_datetime(np.asarray(ds[lo:hi])))
+        return out
+
+    def _open(self, run_id):
+        cols = self._columns.get(run_id)
+        if cols is None:
+            path = os.path.join(self.root, run_id)
+            if not os.path.isdir(path):
+                raise KeyError(f"Unknown forecast run: {run_id}")
+            cols = (np.load(os.path.join(path, "ds.npy"), mmap_mode="r"),
+                    np.load(os.path.join(path, "values.npy"), mmap_mode="r"))
+            self._columns[run_id] = cols
+        return cols
+
+    # 5️ Retention
+
+    def evict(self, keep_last=None, older_than=None):
+        """Delete old runs and return their run_ids.
+
+        keep_last keeps the newest N runs per (asset, model, config), whatever data
+        they were trained on, so refreshing the data doesn't grow the store;
+        older_than drops runs whose run time is before that timestamp
+        (tz-aware, or naive UTC like the stored run times).
+        """
+        newest_first = sorted(self._catalog, key=lambda r: r["run_time"], reverse=True)
+        cutoff = f"{_utc(older_than):%Y-%m-%dT%H:%M:%S.%f}" if older_than is not None else None
+        seen = {}
+        removed = []
+        for r in newest_first:
+            key = (r["asset"], r.get("model"), r["config_id"])
+            seen[key] = seen.get(key, 0) + 1
+            too_many = keep_last is not None and seen[key] > keep_last
+            too_old = cutoff is not None and r["run_time"] < cutoff
+            if too_many or too_old:
+                removed.append(r["run_id"])
+
+        for run_id in removed:
+            self._columns.pop(run_id, None)
+            shutil.rmtree(os.path.join(self.root, run_id), ignore_errors=True)
+        self._write_catalog([r for r in self._catalog if r["run_id"] not in removed])
+        return removed
+
+    # Catalog file
+
+    def _catalog_path(self):
+        return os.path.join(self.root, "catalog.json")
+
+    def _read_catalog(self):
+        if not os.path.exists(self._catalog_path()):
+            return []
+        with open(self._catalog_path()) as f:
+            return json.load(f)
+
+    def _write_catalog(self, catalog):
+        # The in-memory catalog only changes once the file has been replaced
+        tmp = self._catalog_path() + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(catalog, f, indent=2)
+            os.replace(tmp, self._catalog_path())
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._catalog = catalog
+        self._latest.clear()
@@ -3,6 +3,7 @@ import pandas as pd
 import plotly.graph_objects as go
 from prophet import Prophet
 from sklearn.linear_model import LinearRegression
+from forecast_store import ForecastStore, data_version
 
 #Load datasets
 btc = pd.read_csv("btc_full_dataset_with_indicators.csv", parse_dates=['Date'])
@@ -43,6 +44,15 @@ def forecast(df):
 btc_forecast = forecast(btc)
 eth_forecast = forecast(eth)
 
+#Save forecasts so other tools can query them without refitting
+store = ForecastStore("forecast_store")
+config = {"model": "prophet", "regressors": ["Supply", "Demand"], "periods": 30}
+store.save("BTC", btc_forecast, model="prophet_regressors", config=config,
+           data_version=data_version(btc[['Date', 'Close', 'SplyCur', 'AdrActCnt']]))
+store.save("ETH", eth_forecast, model="prophet_regressors", config=config,
+           data_version=data_version(eth[['Date', 'Close', 'SplyCur', 'AdrActCnt']]))
+store.evict(keep_last=5)  # keep the 5 newest runs per asset / model / config
+
 #Define key events
 events = [
     {"date": "2020-03-12", "label": "COVID-19 Crash", "details": "Global market crash due to pandemic"},
@@ -3,6 +3,7 @@ import pandas as pd
 from prophet import Prophet
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from forecast_store import ForecastStore, data_version
 
 
 # 2️ Load datasets
@@ -39,6 +40,14 @@ eth_future = eth_model.make_future_dataframe(periods=future_periods)
 btc_forecast = btc_model.predict(btc_future)
 eth_forecast = eth_model.predict(eth_future)
 
+# Save forecasts so alerts / notebooks can query them without refitting
+store = ForecastStore("forecast_store")
+config = {"model": "prophet", "daily_seasonality": False, "weekly_seasonality": True,
+          "yearly_seasonality": True, "periods": future_periods}
+store.save("BTC", btc_forecast, model="prophet_seasonal", config=config, data_version=data_version(btc_df))
+store.save("ETH", eth_forecast, model="prophet_seasonal", config=config, data_version=data_version(eth_df))
+store.evict(keep_last=5)  # keep the 5 newest runs per asset / model / config
+
 
 # 6️ Plot BTC and ETH Forecasts
 
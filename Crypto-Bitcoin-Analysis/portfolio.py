@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+
+
+# 1️ Shrinkage covariance, batched over windows
+
+def shrunk_moments(windows):
+    """Mean and Ledoit-Wolf covariance for a stack of return windows.
+
+    windows has shape (dates, lookback, assets). The covariance is shrunk
+    towards a scaled identity with the Ledoit-Wolf (2004) intensity, which
+    keeps it well conditioned even when assets outnumber observations.
+    Returns (mu, cov, shrinkage) with shapes (D, N), (D, N, N), (D,).
+    """
+    windows = np.asarray(windows, dtype=float)
+    n_obs, n_assets = windows.shape[1], windows.shape[2]
+    mu = windows.mean(axis=1)
+    X = windows - mu[:, None, :]
+
+    S = X.transpose(0, 2, 1) @ X / n_obs
+    scale = np.trace(S, axis1=1, axis2=2) / n_assets
+    eye = np.eye(n_assets)
+    d2 = ((S - scale[:, None, None] * eye) ** 2).sum(axis=(1, 2))
+    sq_norms = (X ** 2).sum(axis=2)
+    b2 = ((sq_norms ** 2).sum(axis=1) / n_obs - (S ** 2).sum(axis=(1, 2))) / n_obs
+    shrinkage = np.where(d2 > 0, np.minimum(b2, d2) / np.where(d2 > 0, d2, 1), 1.0)
+
+    cov = shrinkage[:, None, None] * scale[:, None, None] * eye + (1 - shrinkage)[:, None, None] * S
+    return mu, cov, shrinkage
+
+
+# 2️ Portfolio weights (all batched over dates)
+#
+# Every function accepts a single (N,) / (N, N) problem or a stack of them
+# with leading date dimensions. Without long_only, minimum-variance and
+# max-Sharpe are the closed-form fully invested solutions (shorts allowed);
+# risk parity is long-only by construction.
+
+def _project_simplex(v):
+    # Euclidean projection of each row onto {w >= 0, sum(w) = 1}
+    u = -np.sort(-v, axis=-1)
+    css = np.cumsum(u, axis=-1) - 1
+    k = np.arange(1, v.shape[-1] + 1)
+    rho = (u - css / k > 0).sum(axis=-1, keepdims=True)
+    theta = np.take_along_axis(css, rho - 1, axis=-1) / rho
+    return np.maximum(v - theta, 0)
+
+
+def _largest_eigenvalue(cov, n_iter=30):
+    v = np.ones(cov.shape[:-1])
+    for _ in range(n_iter):
+        v = (cov @ v[..., None])[..., 0]
+        v /= np.linalg.norm(v, axis=-1, keepdims=True)
+    return np.einsum("...a,...ab,...b->...", v, cov, v)
+
+
+def mean_variance_weights(mu, cov, risk_aversion, n_iter=500, tol=1e-7):
+    """Long-only weights maximising mu'w - risk_aversion/2 * w'cov w (projected FISTA).
+
+    mu has shape (..., K, N) for K problems sharing each covariance (..., N, N),
+    and risk_aversion broadcasts against (..., K), so a whole grid is solved
+    at once. Returns weights of shape (..., K, N).
+    """
+    risk_aversion = np.broadcast_to(risk_aversion, mu.shape[:-1])[..., None]
+    step = 1 / (risk_aversion * _largest_eigenvalue(cov)[..., None, None] * 1.01)
+    w = z = np.full(mu.shape, 1.0 / mu.shape[-1])
+    t = 1.0
+    for _ in range(n_iter):
+        grad = risk_aversion * (z @ cov) - mu  # cov is symmetric
+        w_next = _project_simplex(z - step * grad)
+        if np.abs(w_next - w).max() < tol:
+            return w_next
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        z = w_next + (t - 1) / t_next * (w_next - w)
+        w, t = w_next, t_next
+    return w
+
+
+def min_variance_weights(cov, long_only=False):
+    if long_only:
+        return mean_variance_weights(np.zeros(cov.shape[:-2] + (1, cov.shape[-1])), cov, 1.0)[..., 0, :]
+    ones = np.ones(cov.shape[:-1] + (1,))
+    x = np.linalg.solve(cov, ones)[..., 0]
+    return x / x.sum(axis=-1, keepdims=True)
+
+
+def max_sharpe_weights(mu, cov, rf=0.0, long_only=False, n_grid=16):
+    """Tangency portfolio.
+
+    With long_only, the long-only frontier is traced on a log grid of n_grid
+    risk aversions in one batched solve and the best-Sharpe point is kept.
+    Without it, dates where no fully invested portfolio has a positive
+    excess return (sum of cov^-1 (mu - rf) <= 0) get NaN weights.
+    """
+    excess = mu - rf
+    if not long_only:
+        x = np.linalg.solve(cov, excess[..., None])[..., 0]
+        total = x.sum(axis=-1, keepdims=True)
+        # Normalising by a negative sum would flip the portfolio to its worst-Sharpe mirror
+        return np.where(total > 0, x, np.nan) / np.where(total > 0, total, 1.0)
+
+    # Risk aversions spanning the frontier, scaled to these moments
+    level = np.abs(excess).max(axis=-1) / np.diagonal(cov, axis1=-2, axis2=-1).min(axis=-1)
+    grid = level[..., None] * np.logspace(-2, 2, n_grid)
+    shape = excess.shape[:-1] + (n_grid, excess.shape[-1])
+    w = mean_variance_weights(np.broadcast_to(excess[..., None, :], shape), cov, grid)
+    ret = (w * excess[..., None, :]).sum(axis=-1)
+    vol = np.sqrt(((w @ cov) * w).sum(axis=-1))
+    best = np.argmax(ret / vol, axis=-1)
+    return np.take_along_axis(w, best[..., None, None], axis=-2)[..., 0, :]
+
+
+def risk_parity_weights(cov, budget=None, n_iter=50, tol=1e-8):
+    """Equal (or budgeted) risk contributions, via batched Newton steps.
+
+    Solves cov @ y = budget / y for y > 0 (Spinu, 2013) and normalises y.
+    """
+    n = cov.shape[-1]
+    budget = np.full(n, 1.0 / n) if budget is None else np.asarray(budget, dtype=float)
+    y = 1 / np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+
+    for _ in range(n_iter):
+        grad = (cov @ y[..., None])[..., 0] - budget / y
+        if np.abs(grad * y).max() < tol * budget.max():
+            break
+        hess = cov + np.eye(n) * (budget / y ** 2)[..., None, :]
+        step = np.linalg.solve(hess, grad[..., None])[..., 0]
+        # Damp the step per date so y stays positive
+        ratio = np.where(step > 0, step / y, 0).max(axis=-1, keepdims=True)
+        alpha = np.minimum(1.0, 0.5 / np.maximum(ratio, 0.5))
+        y = y - alpha * step
+    return y / y.sum(axis=-1, keepdims=True)
+
+
+def efficient_frontier(mu, cov, n_points=50, periods=365, rf=0.0):
+    """Closed-form (shorting allowed) efficient frontier for one set of moments.
+
+    mu and cov are per-period (e.g. daily) estimates, as Series / DataFrame
+    labelled by asset. Returns one row per target return with annualised
+    return, volatility, Sharpe ratio and the asset weights.
+    """
+    assets = list(mu.index)
+    m = mu.to_numpy(dtype=float)
+    c = cov.to_numpy(dtype=float)
+
+    x1 = np.linalg.solve(c, np.ones(len(m)))
+    xm = np.linalg.solve(c, m)
+    A, B, C = x1.sum(), xm.sum(), m @ xm
+    D = A * C - B ** 2
+
+    # From the minimum-variance return up to the best single asset's return
+    targets = np.linspace(B / A, max(m.max(), B / A), n_points)
+    lam = (C - B * targets) / D
+    gam = (A * targets - B) / D
+    weights = lam[:, None] * x1 + gam[:, None] * xm
+    var = np.maximum((A * targets ** 2 - 2 * B * targets + C) / D, 0)
+
+    out = pd.DataFrame(weights, columns=assets)
+    out.insert(0, "Return", targets * periods)
+    out.insert(1, "Volatility", np.sqrt(var * periods))
+    out.insert(2, "Sharpe", (targets - rf) * periods / out["Volatility"])
+    return out
+
+
+# 3️ Rolling rebalancing backtest
+
+WEIGHTS = {
+    "min_variance": lambda mu, cov, long_only: min_variance_weights(cov, long_only=long_only),
+    "max_sharpe": lambda mu, cov, long_only: max_sharpe_weights(mu, cov, long_only=long_only),
+    "risk_parity": lambda mu, cov, long_only: risk_parity_weights(cov),
+    "equal_weight": lambda mu, cov, long_only: np.full(mu.shape, 1.0 / mu.shape[-1]),
+}
+
+
+def rolling_weights(returns, method="min_variance", lookback=252, rebalance="W", long_only=True, chunk=64):
+    """Target weights at every rebalance date, from the previous `lookback` rows.
+
+    returns is a (dates x assets) DataFrame of simple returns without gaps
+    (e.g. combined.dropna()). All rebalance dates are solved together, in
+    chunks of `chunk` dates to bound memory.
+    """
+    values = returns.to_numpy(dtype=float)
+    dates = returns.index
+    # Last available row of every rebalance period, once a full window exists
+    last_rows = pd.Series(np.arange(len(dates)), index=dates).resample(rebalance).last().dropna()
+    ends = last_rows.to_numpy(dtype=int) + 1
+    ends = ends[ends >= lookback]
+
+    windows = np.lib.stride_tricks.sliding_window_view(values, lookback, axis=0)  # (T-L+1, N, L)
+    solve = WEIGHTS[method]
+    weights = []
+    for i in range(0, len(ends), chunk):
+        w = windows[ends[i:i + chunk] - lookback].transpose(0, 2, 1)
+        mu, cov, _ = shrunk_moments(w)
+        weights.append(solve(mu, cov, long_only))
+
+    weights = np.concatenate(weights) if weights else np.empty((0, values.shape[1]))
+    return pd.DataFrame(weights, index=dates[ends - 1], columns=returns.columns)
+
+
+def backtest(returns, method="min_variance", lookback=252, rebalance="W", long_only=True,
+             cost_bps=0.0, periods=365):
+    """Rolling-rebalance backtest on a returns panel.
+
+    Weights computed at the close of a rebalance date are held (rebalanced to
+    target daily) until the next one. Returns (daily portfolio returns, weights,
+    summary dict with annualised return/volatility/Sharpe, max drawdown and
+    average turnover).
+    """
+    weights = rolling_weights(returns, method=method, lookback=lookback, rebalance=rebalance,
+                              long_only=long_only)
+    held = weights.reindex(returns.index).ffill().shift(1).dropna()
+    port = (held * returns.loc[held.index]).sum(axis=1)
+
+    turnover = weights.diff().abs().sum(axis=1)
+    turnover.iloc[:1] = weights.iloc[:1].abs().sum(axis=1)
+    if cost_bps:
+        # Charged on the first day each new set of weights is held
+        pos = held.index.searchsorted(weights.index, side="right")
+        live = pos < len(held)
+        costs = pd.Series(turnover.to_numpy()[live] * cost_bps / 1e4, index=held.index[pos[live]])
+        port = port - costs.groupby(level=0).sum().reindex(port.index, fill_value=0)
+
+    equity = (1 + port).cumprod()
+    vol = port.std() * np.sqrt(periods)
+    summary = {
+        "Return": (equity.iloc[-1] ** (periods / len(port)) - 1) if len(port) else np.nan,
+        "Volatility": vol,
+        "Sharpe": port.mean() * periods / vol if vol > 0 else np.nan,
+        "MaxDrawdown": (equity / equity.cummax() - 1).min(),
+        "Turnover": turnover.mean(),
+    }
+    return port.rename(method), weights, summary
@@ -0,0 +1,248 @@
+import heapq
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.signal import find_peaks
+
+from shared_panel import SharedPanel, map_panel
+
+
+# 1️ Change-point detection (PELT)
+
+def _segment_cost(s1, s2, starts, ends, cost, scale):
+    # Cost of segments x[start:end], vectorised over starts and/or ends
+    m = ends - starts
+    a = s1[ends] - s1[starts]
+    b = s2[ends] - s2[starts]
+    if cost == "normal":
+        # Gaussian with its own mean and variance -> m * log(var)
+        var = np.maximum(b / m - (a / m) ** 2, scale)
+        return m * np.log(var)
+    # Gaussian mean shift with a shared noise variance
+    return (b - a * a / m) / scale
+
+
+def _prepare(x, cost):
+    s1 = np.concatenate([[0.0], np.cumsum(x)])
+    s2 = np.concatenate([[0.0], np.cumsum(x * x)])
+    if cost == "normal":
+        scale = max(np.var(x), 1e-300) * 1e-6  # variance floor
+    elif cost == "mean":
+        # Noise level from first differences, robust to the level shifts themselves
+        d = np.diff(x)
+        scale = max((np.median(np.abs(d - np.median(d))) * 1.4826) ** 2 / 2, 1e-300)
+    else:
+        raise ValueError(f"Unknown cost: {cost}")
+    return s1, s2, scale
+
+
+def pelt(x, penalty=None, min_size=30, cost="normal"):
+    """Return the indices where a new segment starts (PELT, linear time on average).
+
+    cost="normal" finds changes in mean and variance (use it on returns, this
+    is what separates calm and turbulent volatility regimes), cost="mean" finds
+    level shifts in a roughly uncorrelated series. Both costs are scale-free,
+    so the same penalty works for any asset.
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    if n < 2 * min_size:
+        return []
+    if penalty is None:
+        penalty = 3 * np.log(n)
+    s1, s2, scale = _prepare(x, cost)
+
+    F = np.full(n + 1, np.inf)
+    F[0] = -penalty
+    prev = np.zeros(n + 1, dtype=np.intp)
+    R = np.empty(n + 1, dtype=np.intp)  # candidate starts, first k are live
+    k = 0
+
+    for t in range(min_size, n + 1):
+        s = t - min_size
+        if F[s] < np.inf:
+            R[k] = s
+            k += 1
+        cand = R[:k]
+        c = F[cand] + _segment_cost(s1, s2, cand, t, cost, scale)
+        i = c.argmin()
+        F[t] = c[i] + penalty
+        prev[t] = cand[i]
+        # Pruning: a start that can't beat F[t] now never will
+        keep = cand[c <= F[t]]
+        k = len(keep)
+        R[:k] = keep
+
+    cps = []
+    t = prev[n]
+    while t > 0:
+        cps.append(int(t))
+        t = prev[t]
+    return cps[::-1]
+
+
+def binseg(x, penalty=None, min_size=30, cost="normal"):
+    """Binary segmentation with the same costs as pelt(), O(n log n).
+
+    Approximate, but each split is a single vectorised scan, which makes it
+    the faster choice for very large universes.
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    if n < 2 * min_size:
+        return []
+    if penalty is None:
+        penalty = 3 * np.log(n)
+    s1, s2, scale = _prepare(x, cost)
+
+    def best_split(a, b):
+        ks = np.arange(a + min_size, b - min_size + 1)
+        if len(ks) == 0:
+            return None
+        gain = (_segment_cost(s1, s2, a, b, cost, scale)
+                - _segment_cost(s1, s2, a, ks, cost, scale)
+                - _segment_cost(s1, s2, ks, b, cost, scale))
+        i = gain.argmax()
+        return (-gain[i], a, int(ks[i]), b)
+
+    heap = [best_split(0, n)]
+    cps = []
+    while heap and heap[0] is not None and -heap[0][0] > penalty:
+        _, a, k, b = heapq.heappop(heap)
+        cps.append(k)
+        # Only the two new segments need re-scanning
+        for split in (best_split(a, k), best_split(k, b)):
+            if split is not None:
+                heapq.heappush(heap, split)
+    return sorted(cps)
+
+
+def detect_regimes(series, penalty=None, min_size=30, cost="normal", method="pelt", periods=365):
+    """Segment a Series into regimes and summarise each one.
+
+    method is "pelt" (exact) or "binseg" (approximate, faster).
+    Returns a DataFrame with start, end, n_obs, mean and annualised volatility
+    per regime, in date order.
+    """
+    s = pd.to_numeric(series, errors="coerce").dropna()
+    values = s.to_numpy()
+    if method not in ("pelt", "binseg"):
+        raise ValueError(f"Unknown method: {method}")
+    detect = pelt if method == "pelt" else binseg
+    bounds = [0] + detect(values, penalty=penalty, min_size=min_size, cost=cost) + [len(values)]
+
+    rows = []
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        seg = values[a:b]
+        rows.append({
+            "start": s.index[a],
+            "end": s.index[b - 1],
+            "n_obs": b - a,
+            "mean": seg.mean(),
+            "volatility": seg.std(ddof=1) * np.sqrt(periods),
+        })
+    return pd.DataFrame(rows, columns=["start", "end", "n_obs", "mean", "volatility"])
+
+
+# 2️ Scale-free peak / trough detection
+
+def turning_points(close, min_move=0.3, distance=90):
+    """Find major peaks and troughs of a price series.
+
+    Works on log prices, so min_move is a relative move (0.3 = a 30% rise, or
+    about a 23% fall, between a turning point and its surroundings)
+    and one setting fits BTC, ETH or any other asset.
+    Returns (peak_positions, trough_positions) as integer arrays.
+    """
+    log_close = np.log(pd.to_numeric(close, errors="coerce").ffill().bfill().to_numpy())
+    prominence = np.log1p(min_move)
+    peaks, _ = find_peaks(log_close, distance=distance, prominence=prominence)
+    troughs, _ = find_peaks(-log_close, distance=distance, prominence=prominence)
+    return peaks, troughs
+
+
+# 3️ Streaming mode
+
+class StreamingRegimeDetector:
+    """Flag volatility regime changes as new returns arrive (two-sided CUSUM).
+
+    update(x) returns True when a new regime starts; regime_starts holds the
+    bar number (0-based, in update order) of every regime start.
+    """
+
+    def __init__(self, threshold=10.0, ratio=2.0, min_size=30, clip=3.0):
+        self.threshold = threshold
+        self.min_size = min_size
+        self.clip = clip
+        # Log-likelihood ratio terms for the variance jumping up/down by `ratio`
+        self._up = (-np.log(ratio), 0.5 * (1 - 1 / ratio ** 2))
+        self._down = (np.log(ratio), 0.5 * (1 - ratio ** 2))
+        self.n_seen = 0
+        self.regime_starts = [0]
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._g_up = 0.0
+        self._g_down = 0.0
+        self._last_zero = self.n_seen
+
+    def update(self, x):
+        bar = self.n_seen
+        self.n_seen += 1
+        if not np.isfinite(x):
+            return False
+
+        changed = False
+        if self._count >= self.min_size:
+            sd = np.sqrt(self._m2 / (self._count - 1))
+            z2 = min(((x - self._mean) / sd) ** 2, self.clip ** 2) if sd > 0 else 0.0
+            self._g_up = max(0.0, self._g_up + self._up[0] + self._up[1] * z2)
+            self._g_down = max(0.0, self._g_down + self._down[0] + self._down[1] * z2)
+            if self._g_up == 0.0 and self._g_down == 0.0:
+                self._last_zero = bar + 1
+            if max(self._g_up, self._g_down) > self.threshold:
+                # Change is dated to where the CUSUM last left zero
+                self.regime_starts.append(self._last_zero)
+                self._reset_stats()
+                changed = True
+
+        self._count += 1
+        delta = x - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (x - self._mean)
+        return changed
+
+    def run(self, values):
+        """Feed a batch of bars; return the start positions of any new regimes."""
+        before = len(self.regime_starts)
+        for x in values:
+            self.update(float(x))
+        return self.regime_starts[before:]
+
+
+# 4️ Parallel runs across an asset universe
+
+def _detect_column(panel, task):
+    name, kwargs = task
+    return name, detect_regimes(panel[name], **kwargs)
+
+
+def detect_universe(panel, n_jobs=None, **kwargs):
+    """Run detect_regimes on every column of a (dates x assets) DataFrame in parallel.
+
+    Defaults to method="binseg" (1,000 assets of daily history in about a
+    second per core); pass method="pelt" for exact segmentations. The panel
+    is shared with the workers through shared memory rather than pickled.
+    Returns {asset: regimes DataFrame}.
+    """
+    kwargs.setdefault("method", "binseg")
+    n_jobs = n_jobs or os.cpu_count() or 1
+    tasks = [(name, kwargs) for name in panel.columns]
+    if n_jobs == 1 or len(tasks) < 2:
+        return dict(_detect_column(panel, task) for task in tasks)
+    with SharedPanel(panel) as shared:
+        return dict(map_panel(_detect_column, shared.handle, tasks, n_jobs=n_jobs))
@@ -0,0 +1,134 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+# 1️ Shared-memory handoff of the numeric panel to worker processes
+#
+# The owner copies a (dates x columns) float frame and its date index into two
+# shared-memory blocks once. Workers get a small handle (block names, shape,
+# column labels) and attach read-only views in O(1), so nothing is pickled
+# per task and RAM does not grow with the number of workers.
+
+PanelHandle = namedtuple("PanelHandle", ["values_name", "index_name", "shape", "columns",
+                                         "index_label", "index_unit", "index_tz"])
+
+_attached = {}  # blocks this process has attached, kept open while views exist
+
+
+class SharedPanel:
+    """Publish a numeric DataFrame in shared memory.
+
+    with SharedPanel(df) as panel:
+        results = map_panel(fit_one, panel.handle, df.columns)
+
+    The blocks are freed when the owner leaves the with-block (or calls close()).
+    """
+
+    def __init__(self, df):
+        values = np.ascontiguousarray(df.to_numpy(dtype=np.float64, na_value=np.nan))
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise TypeError(f"SharedPanel needs a DatetimeIndex, got {type(df.index).__name__}")
+        index = df.index
+        index_ticks = index.asi8  # int64 in the index's own unit
+
+        self._values_shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        self._index_shm = shared_memory.SharedMemory(create=True, size=max(index_ticks.nbytes, 1))
+        np.ndarray(values.shape, dtype=np.float64, buffer=self._values_shm.buf)[:] = values
+        np.ndarray(index_ticks.shape, dtype=np.int64, buffer=self._index_shm.buf)[:] = index_ticks
+
+        self.handle = PanelHandle(
+            values_name=self._values_shm.name,
+            index_name=self._index_shm.name,
+            shape=values.shape,
+            columns=list(df.columns),
+            index_label=index.name,
+            index_unit=index.unit,
+            index_tz=str(index.tz) if index.tz is not None else None,
+        )
+
+    def close(self):
+        for shm in (self._values_shm, self._index_shm):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _open(name):
+    shm = _attached.get(name)
+    if shm is None:
+        try:
+            # Python 3.13+: attaching must not make this process an owner of the block
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Older Pythons register it with the resource tracker, which the
+            # publisher's child processes share, so the publisher's unlink still
+            # clears it; processes outside that tree should not attach
+            shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm
+
+
+def attach(handle):
+    """Return a read-only DataFrame view of a published panel (no copy)."""
+    rows, cols = handle.shape
+    values = np.ndarray((rows, cols), dtype=np.float64, buffer=_open(handle.values_name).buf)
+    index_ticks = np.ndarray((rows,), dtype=np.int64, buffer=_open(handle.index_name).buf)
+    values.flags.writeable = False
+    index_ticks.flags.writeable = False
+
+    index = pd.DatetimeIndex(index_ticks.view(f"datetime64[{handle.index_unit}]"), name=handle.index_label)
+    if handle.index_tz:
+        index = index.tz_localize("UTC").tz_convert(handle.index_tz)
+    return pd.DataFrame(values, index=index, columns=handle.columns, copy=False)
+
+
+def detach(handle):
+    """Close this process' mappings of a panel (views must no longer be used)."""
+    for name in (handle.values_name, handle.index_name):
+        shm = _attached.pop(name, None)
+        if shm is not None:
+            shm.close()
+
+
+# 2️ Process-pool helpers
+
+_worker_panel = None
+
+
+def _init_worker(handle):
+    global _worker_panel
+    _worker_panel = attach(handle)
+
+
+def worker_panel():
+    """The panel attached in the current worker (set up by map_panel)."""
+    if _worker_panel is None:
+        raise RuntimeError("No shared panel attached in this process")
+    return _worker_panel
+
+
+def map_panel(func, handle, items, n_jobs=None, chunksize=None):
+    """Call func(panel, item) for each item in a process pool.
+
+    Every worker attaches the panel once at start-up; only the items and the
+    results cross process boundaries. func must be a module-level function.
+    """
+    items = list(items)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(items) // (n_jobs * 4))
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(handle,)) as pool:
+        return list(pool.map(_call, [func] * len(items), items, chunksize=chunksize))
+
+
+def _call(func, item):
+    return func(worker_panel(), item)